@@ -23,7 +23,7 @@ shortcut_specs = {
 
 def _validate(python_list_to_validate):
     with open(schema_path, "r") as f:
-        schema = json.loads(f.read())
+        schema = json.load(f)
     jsonschema.validate(instance=python_list_to_validate, schema=schema)
     # Check properties to instrument and excluded properties don't collide
     for setting in python_list_to_validate:
@@ -237,7 +237,7 @@ def clean_js_instrumentation_settings(
     for setting in user_requested_settings:
         if isinstance(setting, str) and (setting in shortcut_specs):
             with open(shortcut_specs[setting], "r") as f:
-                shortcut_spec = json.loads(f.read())
+                shortcut_spec = json.load(f)
             for sub_setting in shortcut_spec:
                 settings.append(_build_full_settings_object(sub_setting))
         else:
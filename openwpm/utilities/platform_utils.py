@@ -1,46 +1,80 @@
 import json
+import math
 import os
+import stat
 import subprocess
-from collections import OrderedDict
-from copy import deepcopy
+from functools import lru_cache
 from sys import platform
 
-from tabulate import tabulate
-
 from openwpm.config import ConfigEncoder
 
+_ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if platform == "darwin":
+    _DEFAULT_FIREFOX_BINARY_PATH = os.path.join(
+        _ROOT_DIR, "Nightly.app", "Contents", "MacOS", "firefox-bin"
+    )
+else:
+    _DEFAULT_FIREFOX_BINARY_PATH = os.path.join(_ROOT_DIR, "firefox-bin", "firefox-bin")
+
+# Encoders used by get_configuration_string, shared across calls
+_MANAGER_CONFIG_ENCODER = ConfigEncoder(
+    sort_keys=True, indent=2, separators=(",", ": ")
+)
+_INDENTED_ENCODER = json.JSONEncoder(indent=2, separators=(",", ": "))
+_COMPACT_ENCODER = json.JSONEncoder(indent=None, separators=(",", ":"))
+
 
 def parse_http_stack_trace_str(trace_str):
     """Parse a stacktrace string and return an array of dict."""
     stack_trace = []
     frames = trace_str.split("\n")
     for frame in frames:
-        try:
-            func_name, rest = frame.split("@", 1)
-            rest, async_cause = rest.rsplit(";", 1)
-            filename, line_no, col_no = rest.rsplit(":", 2)
-            stack_trace.append(
-                {
-                    "func_name": func_name,
-                    "filename": filename,
-                    "line_no": line_no,
-                    "col_no": col_no,
-                    "async_cause": async_cause,
-                }
-            )
-        except Exception as exc:
-            print("Exception parsing the stack frame %s %s" % (frame, exc))
+        func_name, at, rest = frame.partition("@")
+        rest, semicolon, async_cause = rest.rpartition(";")
+        location = rest.rsplit(":", 2)
+        if not at or not semicolon or len(location) != 3:
+            print("Exception parsing the stack frame %s" % frame)
+            continue
+        filename, line_no, col_no = location
+        stack_trace.append(
+            {
+                "func_name": func_name,
+                "filename": filename,
+                "line_no": line_no,
+                "col_no": col_no,
+                "async_cause": async_cause,
+            }
+        )
     return stack_trace
 
 
+def _is_regular_file(path):
+    """Return whether `path` is a regular file, using a single stat call."""
+    try:
+        return stat.S_ISREG(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
+
+
 def get_firefox_binary_path():
     """
     If ../../firefox-bin/firefox-bin or os.environ["FIREFOX_BINARY"] exists,
     return it. Else, throw a RuntimeError.
     """
-    if "FIREFOX_BINARY" in os.environ:
-        firefox_binary_path = os.environ["FIREFOX_BINARY"]
-        if not os.path.isfile(firefox_binary_path):
+    return _resolve_firefox_binary_path(os.environ.get("FIREFOX_BINARY"))
+
+
+@lru_cache(maxsize=None)
+def _resolve_firefox_binary_path(env_binary_path):
+    """Resolve and validate the Firefox binary path.
+
+    Results are cached per value of the `FIREFOX_BINARY` override so the
+    filesystem is only checked once, while changes to the environment
+    variable at runtime still take effect. Failed lookups are not cached.
+    """
+    if env_binary_path is not None:
+        firefox_binary_path = env_binary_path
+        if not _is_regular_file(firefox_binary_path):
             raise RuntimeError(
                 "No file found at the path specified in "
                 "environment variable `FIREFOX_BINARY`."
@@ -48,15 +82,8 @@ def get_firefox_binary_path():
             )
         return firefox_binary_path
 
-    root_dir = os.path.dirname(__file__) + "/../.."
-    if platform == "darwin":
-        firefox_binary_path = os.path.abspath(
-            root_dir + "/Nightly.app/Contents/MacOS/firefox-bin"
-        )
-    else:
-        firefox_binary_path = os.path.abspath(root_dir + "/firefox-bin/firefox-bin")
-
-    if not os.path.isfile(firefox_binary_path):
+    firefox_binary_path = _DEFAULT_FIREFOX_BINARY_PATH
+    if not _is_regular_file(firefox_binary_path):
         raise RuntimeError(
             "The `firefox-bin/firefox-bin` binary is not found in the root "
             "of the  OpenWPM directory (did you run the install script "
@@ -66,98 +93,219 @@ def get_firefox_binary_path():
     return firefox_binary_path
 
 
-def get_version():
-    """Return OpenWPM version tag/current commit and Firefox version"""
-    try:
-        openwpm = subprocess.check_output(
-            ["git", "describe", "--tags", "--always"]
-        ).strip()
-    except subprocess.CalledProcessError:
-        ver = os.path.join(os.path.dirname(__file__), "../../VERSION")
-        with open(ver, "r") as f:
-            openwpm = f.readline().strip()
-
-    firefox_binary_path = get_firefox_binary_path()
+def get_version(firefox_binary_path=None):
+    """Return OpenWPM version tag/current commit and Firefox version
+
+    `firefox_binary_path` can be passed by callers that have already
+    resolved the binary; it defaults to `get_firefox_binary_path()`.
+    """
+    openwpm = _get_openwpm_version()
+    if firefox_binary_path is None:
+        firefox_binary_path = get_firefox_binary_path()
+    ff = _get_firefox_version(firefox_binary_path)
+    return openwpm, ff
+
+
+@lru_cache(maxsize=None)
+def _get_firefox_version(firefox_binary_path):
+    """Return the version reported by `firefox --version` for a binary."""
     try:
-        firefox = subprocess.check_output([firefox_binary_path, "--version"])
+        firefox = subprocess.check_output([firefox_binary_path, "--version"], text=True)
     except subprocess.CalledProcessError as e:
         raise RuntimeError("Firefox not found. " " Did you run `./install.sh`?") from e
 
-    ff = firefox.split()[-1]
-    return openwpm, ff
+    return firefox.split()[-1]
+
+
+@lru_cache(maxsize=1)
+def _get_openwpm_version():
+    """Return the OpenWPM tag/commit from git, or the VERSION file outside a checkout"""
+    if os.path.exists(os.path.join(_ROOT_DIR, ".git")):
+        try:
+            git_describe = subprocess.run(
+                ["git", "describe", "--tags", "--always"],
+                cwd=_ROOT_DIR,
+                capture_output=True,
+                check=False,
+                text=True,
+            )
+        except OSError:
+            # git is not installed
+            pass
+        else:
+            if git_describe.returncode == 0:
+                return git_describe.stdout.strip()
+
+    with open(os.path.join(_ROOT_DIR, "VERSION"), "r") as f:
+        return f.readline().strip()
+
+
+# Column types in increasing order of generality, as ranked by tabulate
+_CELL_TYPE_RANKS = {type(None): 0, bool: 1, int: 2, float: 3}
+
+
+def _is_convertible(conv, value):
+    try:
+        conv(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def _cell_type(value):
+    """Classify a table cell the way tabulate does: None, bool, int, float or str"""
+    if value is None:
+        return type(None)
+    is_str = isinstance(value, str)
+    if type(value) is bool or (is_str and value in ("True", "False")):
+        return bool
+    if type(value) is int or (is_str and _is_convertible(int, value)):
+        return int
+    if _is_convertible(float, value):
+        number = float(value)
+        if not is_str or not (math.isinf(number) or math.isnan(number)):
+            return float
+        if value.lower() in ("inf", "-inf", "nan"):
+            return float
+    return str
+
+
+def _format_cell(value, column_type):
+    if value is None:
+        return ""
+    if column_type is int:
+        return format(value, "")
+    if column_type is float:
+        return format(float(value), "g")
+    return f"{value}"
+
+
+def _decimals(cell):
+    """Number of characters after the decimal point, -1 if there is none"""
+    if _cell_type(cell) is not float:
+        return -1
+    point = cell.rfind(".")
+    if point < 0:
+        point = cell.lower().rfind("e")
+    return len(cell) - point - 1 if point >= 0 else -1
+
 
+def _format_table(rows, headers):
+    """Render a list of row dicts as a plain-text table.
 
-def get_configuration_string(manager_params, browser_params, versions):
+    A lightweight replacement for tabulate's "simple" format, specialized
+    for the flat, single-line values of the browser configuration rows.
+    `headers` maps each row key to its column header. Column types, number
+    formatting and alignment follow the defaults of tabulate 0.9, the
+    version pinned in environment.yaml: int and float columns (including
+    numeric strings) are decimal aligned and floats use the "g" format,
+    other columns are left aligned and None is rendered as an empty cell.
+    """
+    columns = []
+    for key, header in headers.items():
+        values = [row[key] for row in rows]
+        column_type = max(
+            (_cell_type(value) for value in values),
+            key=lambda cell_type: _CELL_TYPE_RANKS.get(cell_type, 5),
+            default=bool,
+        )
+        cells = [_format_cell(value, column_type) for value in values]
+        if column_type in (int, float):
+            decimals = [_decimals(cell) for cell in cells]
+            max_decimals = max(decimals)
+            cells = [
+                cell + " " * (max_decimals - cell_decimals)
+                for cell, cell_decimals in zip(cells, decimals)
+            ]
+            justify = str.rjust
+        else:
+            cells = [cell.strip() for cell in cells]
+            justify = str.ljust
+        header = str(header)
+        width = max(len(header) + 2, *(len(cell) for cell in cells))
+        columns.append(
+            [justify(header, width), "-" * width]
+            + [justify(cell, width) for cell in cells]
+        )
+    return "\n".join("  ".join(line).rstrip() for line in zip(*columns))
+
+
+def get_configuration_string(
+    manager_params, browser_params, versions, use_tabulate=False
+):
     """Construct a well-formatted string for {manager,browser}params
 
     Constructs a pretty printed string of all parameters. The config
     dictionaries are split to try to avoid line wrapping for reasonably
-    size terminal windows.
+    size terminal windows. The browser configuration table is rendered by
+    a built-in formatter; `use_tabulate` switches to tabulate, which the
+    tests use to check that both renderings agree.
     """
 
-    config_str = "\n\nOpenWPM Version: %s\nFirefox Version: %s\n" % versions
-    config_str += "\n========== Manager Configuration ==========\n"
+    parts = ["\n\nOpenWPM Version: %s\nFirefox Version: %s\n" % versions]
+    parts.append("\n========== Manager Configuration ==========\n")
 
-    config_str += json.dumps(
-        manager_params.to_dict(),
-        sort_keys=True,
-        indent=2,
-        separators=(",", ": "),
-        cls=ConfigEncoder,
-    )
-    config_str += "\n\n========== Browser Configuration ==========\n"
+    parts.append(_MANAGER_CONFIG_ENCODER.encode(manager_params.to_dict()))
+    parts.append("\n\n========== Browser Configuration ==========\n")
 
-    print_params = [deepcopy(x.to_dict()) for x in browser_params]
+    print_params = [x.to_dict() for x in browser_params]
+    # Every browser has the same set of keys, so only sort them once
+    separate_keys = (
+        "browser_id",
+        "seed_tar",
+        "profile_archive_dir",
+        "cleaned_js_instrument_settings",
+    )
+    column_keys = ["browser_id"] + sorted(
+        key for key in print_params[0] if key not in separate_keys
+    )
     table_input = list()
-    profile_dirs = OrderedDict()
-    archive_dirs = OrderedDict()
-    js_config = OrderedDict()
+    profile_dirs = {}
+    archive_dirs = {}
+    js_config = {}
     profile_all_none = archive_all_none = True
     for item in print_params:
         browser_id = item["browser_id"]
 
         # Update print flags
-        if item["seed_tar"] is not None:
+        if profile_all_none and item["seed_tar"] is not None:
             profile_all_none = False
-        if item["profile_archive_dir"] is not None:
+        if archive_all_none and item["profile_archive_dir"] is not None:
             archive_all_none = False
 
         # Separate out long profile directory strings
-        profile_dirs[browser_id] = str(item.pop("seed_tar"))
-        archive_dirs[browser_id] = str(item.pop("profile_archive_dir"))
-        js_config[browser_id] = item.pop("cleaned_js_instrument_settings")
+        profile_dirs[browser_id] = str(item["seed_tar"])
+        archive_dirs[browser_id] = str(item["profile_archive_dir"])
+        js_config[browser_id] = item["cleaned_js_instrument_settings"]
 
         # Copy items in sorted order
-        dct = OrderedDict()
-        dct["browser_id"] = browser_id
-        for key in sorted(item.keys()):
-            dct[key] = item[key]
-        table_input.append(dct)
-
-    key_dict = OrderedDict()
-    counter = 0
-    for key in table_input[0].keys():
-        key_dict[key] = counter
-        counter += 1
-    config_str += "Keys:\n"
-    config_str += json.dumps(key_dict, indent=2, separators=(",", ": "))
-    config_str += "\n\n"
-    config_str += tabulate(table_input, headers=key_dict)
-
-    config_str += "\n\n========== JS Instrument Settings ==========\n"
-    config_str += json.dumps(js_config, indent=None, separators=(",", ":"))
-
-    config_str += "\n\n========== Input profile tar files ==========\n"
+        table_input.append({key: item[key] for key in column_keys})
+
+    key_dict = {key: counter for counter, key in enumerate(column_keys)}
+    parts.append("Keys:\n")
+    parts.append(_INDENTED_ENCODER.encode(key_dict))
+    parts.append("\n\n")
+    if use_tabulate:
+        from tabulate import tabulate
+
+        parts.append(tabulate(table_input, headers=key_dict))
+    else:
+        parts.append(_format_table(table_input, key_dict))
+
+    parts.append("\n\n========== JS Instrument Settings ==========\n")
+    parts.append(_COMPACT_ENCODER.encode(js_config))
+
+    parts.append("\n\n========== Input profile tar files ==========\n")
     if profile_all_none:
-        config_str += "  No profile tar files specified"
+        parts.append("  No profile tar files specified")
     else:
-        config_str += json.dumps(profile_dirs, indent=2, separators=(",", ": "))
+        parts.append(_INDENTED_ENCODER.encode(profile_dirs))
 
-    config_str += "\n\n========== Output (archive) profile dirs ==========\n"
+    parts.append("\n\n========== Output (archive) profile dirs ==========\n")
     if archive_all_none:
-        config_str += "  No profile archive directories specified"
+        parts.append("  No profile archive directories specified")
     else:
-        config_str += json.dumps(archive_dirs, indent=2, separators=(",", ": "))
+        parts.append(_INDENTED_ENCODER.encode(archive_dirs))
 
-    config_str += "\n\n"
-    return config_str
+    parts.append("\n\n")
+    return "".join(parts)
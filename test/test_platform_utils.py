@@ -0,0 +1,140 @@
+from pathlib import Path
+
+import pytest
+from tabulate import tabulate
+
+from openwpm.config import BrowserParamsInternal, ManagerParamsInternal
+from openwpm.utilities import platform_utils
+from openwpm.utilities.platform_utils import (
+    _format_table,
+    get_configuration_string,
+    get_firefox_binary_path,
+    parse_http_stack_trace_str,
+)
+
+
+def test_parse_http_stack_trace_str():
+    trace_str = (
+        "loadScript@https://example.com/a.js:10:5;null\n"
+        "@https://example.com:8080/b.js?x=1:20:15;setTimeout handler\n"
+        "not a stack frame"
+    )
+    assert parse_http_stack_trace_str(trace_str) == [
+        {
+            "func_name": "loadScript",
+            "filename": "https://example.com/a.js",
+            "line_no": "10",
+            "col_no": "5",
+            "async_cause": "null",
+        },
+        {
+            "func_name": "",
+            "filename": "https://example.com:8080/b.js?x=1",
+            "line_no": "20",
+            "col_no": "15",
+            "async_cause": "setTimeout handler",
+        },
+    ]
+
+
+def test_parse_http_stack_trace_str_malformed_frames():
+    assert parse_http_stack_trace_str("") == []
+    assert parse_http_stack_trace_str("func@file.js;null") == []
+    assert parse_http_stack_trace_str("func@file.js:1:2") == []
+
+
+def test_configuration_table_matches_tabulate():
+    manager_params = ManagerParamsInternal(num_browsers=3)
+    browser_params = [BrowserParamsInternal(browser_id=i) for i in range(3)]
+    browser_params[1].seed_tar = Path("/tmp/profile.tar.gz")
+    for params in browser_params:
+        params.tp_cookies = "1234"
+    browser_params[2].save_content = "script"
+    browser_params[2].prefs = {"privacy.resistFingerprinting": True}
+    versions = ("v0.0.0", "100.0")
+
+    assert get_configuration_string(
+        manager_params, browser_params, versions
+    ) == get_configuration_string(
+        manager_params, browser_params, versions, use_tabulate=True
+    )
+
+
+def test_format_table_matches_tabulate_for_numbers():
+    rows = [
+        {"id": 0, "float": 12345678.9, "mixed": 1, "numeric_str": "12.50"},
+        {"id": 1, "float": 0.5, "mixed": 2.25, "numeric_str": "7"},
+        {"id": 2, "float": None, "mixed": None, "numeric_str": None},
+    ]
+    headers = {key: i for i, key in enumerate(rows[0])}
+
+    assert _format_table(rows, headers) == tabulate(rows, headers=headers)
+
+
+def test_parse_http_stack_trace_str_non_ascii():
+    assert parse_http_stack_trace_str("café@https://例え.jp/ü.js:3:4;null") == [
+        {
+            "func_name": "café",
+            "filename": "https://例え.jp/ü.js",
+            "line_no": "3",
+            "col_no": "4",
+            "async_cause": "null",
+        }
+    ]
+
+
+def test_configuration_string_tracks_manager_params_changes():
+    manager_params = ManagerParamsInternal(num_browsers=1)
+    browser_params = [BrowserParamsInternal(browser_id=0)]
+    versions = ("v0.0.0", "100.0")
+
+    first = get_configuration_string(manager_params, browser_params, versions)
+    assert first == get_configuration_string(manager_params, browser_params, versions)
+
+    manager_params.num_browsers = 3
+    second = get_configuration_string(manager_params, browser_params, versions)
+    assert '"num_browsers": 3' in second
+    assert first != second
+
+
+def test_firefox_binary_path_follows_env_override(monkeypatch, tmp_path):
+    firefox_binary = tmp_path / "firefox-bin"
+    firefox_binary.touch()
+    monkeypatch.setenv("FIREFOX_BINARY", str(firefox_binary))
+    assert get_firefox_binary_path() == str(firefox_binary)
+
+    missing_binary = tmp_path / "missing-firefox-bin"
+    monkeypatch.setenv("FIREFOX_BINARY", str(missing_binary))
+    with pytest.raises(RuntimeError):
+        get_firefox_binary_path()
+
+    # The failed lookup must not be cached
+    missing_binary.touch()
+    assert get_firefox_binary_path() == str(missing_binary)
+
+
+@pytest.fixture
+def openwpm_root(monkeypatch, tmp_path):
+    """Point the OpenWPM root at a temporary directory with a VERSION file"""
+    (tmp_path / "VERSION").write_text("1.2.3\n")
+    monkeypatch.setattr(platform_utils, "_ROOT_DIR", str(tmp_path))
+    platform_utils._get_openwpm_version.cache_clear()
+    yield tmp_path
+    platform_utils._get_openwpm_version.cache_clear()
+
+
+def test_openwpm_version_without_git_checkout(openwpm_root):
+    assert platform_utils._get_openwpm_version() == "1.2.3"
+
+
+def test_openwpm_version_falls_back_when_git_fails(monkeypatch, openwpm_root):
+    # An empty .git directory makes `git describe` exit with an error
+    (openwpm_root / ".git").mkdir()
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(openwpm_root.parent))
+    assert platform_utils._get_openwpm_version() == "1.2.3"
+
+
+def test_openwpm_version_falls_back_without_git_binary(monkeypatch, openwpm_root):
+    (openwpm_root / ".git").mkdir()
+    monkeypatch.setenv("PATH", str(openwpm_root))
+    assert platform_utils._get_openwpm_version() == "1.2.3"